@@ -0,0 +1,161 @@
+"""
+Response Cache
+
+Redis-backed cache for the GET list endpoints. Response bodies are stored as raw
+bytes keyed on path + sorted query params, so a hit never touches MongoDB.
+Caching is disabled when REDIS_URL is not set.
+"""
+
+import hashlib
+import os
+from typing import Dict, Optional
+
+import redis.asyncio as redis
+from dotenv import load_dotenv
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Load environment variables from .env file
+load_dotenv()
+
+CACHE_PREFIX = "edusaas"
+
+# Seconds a list response may be served from cache. Catalog data changes slowly,
+# per-student enrollment/submission state gets a short window. Create handlers call
+# invalidate() on their list path, so these only bound staleness from other writers
+# (direct DB edits, a GET that raced a write).
+CACHE_TTLS: Dict[str, int] = {
+    "/courses": 60,
+    "/lessons": 60,
+    "/assignments": 60,
+    "/quizzes": 60,
+    "/subscriptions": 30,
+    "/enrollments": 5,
+    "/submissions": 5,
+}
+
+# How long the last good payload is kept around for stale-on-error fallback
+STALE_TTL = 24 * 60 * 60
+
+cache_client = None
+
+redis_url = os.getenv("REDIS_URL")
+
+if redis_url:
+    cache_client = redis.from_url(redis_url)
+
+
+def _generation_key(path: str) -> str:
+    return f"{CACHE_PREFIX}:gen:{path}"
+
+
+def _query_digest(request: Request) -> str:
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    return hashlib.sha1(query.encode()).hexdigest()
+
+
+async def cache_key(request: Request) -> str:
+    """Build a cache key from the request path, its sorted query params and the
+    path's current generation (edusaas:/courses:g3:<digest>).
+
+    Bumping the generation orphans every cached page of the list at once; the
+    orphans simply expire with their TTL.
+    """
+    path = request.url.path
+    generation = await _cache_get(_generation_key(path))
+    return f"{CACHE_PREFIX}:{path}:g{int(generation or 0)}:{_query_digest(request)}"
+
+
+def stale_key(request: Request) -> str:
+    """Key of the last good payload for stale-on-error; survives invalidation"""
+    return f"{CACHE_PREFIX}:{request.url.path}:{_query_digest(request)}:stale"
+
+
+async def invalidate(path: str) -> None:
+    """Invalidate every cached page of a list path after a write to its collection"""
+    if cache_client is None:
+        return
+    try:
+        await cache_client.incr(_generation_key(path))
+    except redis.RedisError:
+        pass
+
+
+async def _cache_get(key: str) -> Optional[bytes]:
+    try:
+        return await cache_client.get(key)
+    except redis.RedisError:
+        return None
+
+
+async def _cache_set(key: str, stale: str, body: bytes, ttl: int) -> None:
+    try:
+        async with cache_client.pipeline(transaction=False) as pipe:
+            pipe.set(key, body, ex=ttl)
+            pipe.set(stale, body, ex=STALE_TTL)
+            await pipe.execute()
+    except redis.RedisError:
+        pass
+
+
+def _cached_response(body: bytes, status: str) -> Response:
+    return Response(content=body, media_type="application/json", headers={"X-Cache": status})
+
+
+class ResponseCacheMiddleware:
+    """Serve cached list responses; fall back to the last good payload if the handler fails.
+
+    A plain ASGI middleware rather than @app.middleware("http"): that wrapper turns
+    every response into a chunked stream, which defeats GZipMiddleware's minimum_size.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        ttl = CACHE_TTLS.get(scope.get("path")) if scope["type"] == "http" else None
+        if cache_client is None or ttl is None or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        key = await cache_key(request)
+        cached = await _cache_get(key)
+        if cached is not None:
+            await _cached_response(cached, "HIT")(scope, receive, send)
+            return
+
+        # List pages are bounded, so buffer the response to decide what to send
+        start: Message = {}
+        chunks = []
+
+        async def buffer(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                start.update(message)
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        try:
+            await self.app(scope, receive, buffer)
+        except Exception:
+            stale = await _cache_get(stale_key(request))
+            if stale is None:
+                raise
+            await _cached_response(stale, "STALE")(scope, receive, send)
+            return
+
+        status_code = start["status"]
+        body = b"".join(chunks)
+        if status_code >= 500:
+            stale = await _cache_get(stale_key(request))
+            if stale is not None:
+                await _cached_response(stale, "STALE")(scope, receive, send)
+                return
+        headers = list(start.get("headers", []))
+        if status_code == 200:
+            await _cache_set(key, stale_key(request), body, ttl)
+            headers.append((b"x-cache", b"MISS"))
+
+        await send({"type": "http.response.start", "status": status_code, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
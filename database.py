@@ -1,20 +1,26 @@
 """
 Database Helper Functions
 
-MongoDB helper functions ready to use in your backend code.
-Import and use these functions in your API endpoints for database operations.
+Async MongoDB (Motor) helper functions ready to use in your backend code.
+Import and await these functions in your API endpoints for database operations.
 """
 
-from pymongo import MongoClient
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import BulkWriteError, PyMongoError
 from datetime import datetime, timezone
+import logging
 import os
 from dotenv import load_dotenv
-from typing import Union
-from pydantic import BaseModel
+from functools import lru_cache
+from typing import Dict, List, Tuple, Union
+from pydantic import BaseModel, TypeAdapter
 
 # Load environment variables from .env file
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 _client = None
 db = None
 
@@ -22,34 +28,146 @@ database_url = os.getenv("DATABASE_URL")
 database_name = os.getenv("DATABASE_NAME")
 
 if database_url and database_name:
-    _client = MongoClient(database_url)
+    _client = AsyncIOMotorClient(database_url)
     db = _client[database_name]
 
+# Compound indexes backing the filters used by the list endpoints. List pages are
+# sorted on _id, so each filter combination ends in _id: Mongo then walks the index
+# in order for a page instead of sorting every match in memory. Keep these few and
+# small: the whole index set should fit in the server's RAM.
+INDEXES: Dict[str, List[List[Tuple[str, int]]]] = {
+    "lesson": [[("course_id", 1), ("_id", 1)], [("course_id", 1), ("order", 1)]],
+    "assignment": [[("course_id", 1), ("_id", 1)]],
+    "quiz": [[("course_id", 1), ("_id", 1)]],
+    "enrollment": [
+        [("course_id", 1), ("student_id", 1), ("_id", 1)],
+        [("course_id", 1), ("_id", 1)],
+        [("student_id", 1), ("_id", 1)],
+    ],
+    "submission": [
+        [("assignment_id", 1), ("student_id", 1), ("_id", 1)],
+        [("assignment_id", 1), ("_id", 1)],
+        [("student_id", 1), ("_id", 1)],
+    ],
+    "subscription": [[("user_id", 1), ("_id", 1)]],
+    "activity": [[("user_id", 1), ("created_at", -1)]],
+}
+
+async def ensure_indexes():
+    """Create the list-endpoint indexes; a no-op for indexes that already exist.
+
+    Failures are logged rather than raised so a database outage never stops the
+    app from booting; the indexes are retried on the next start.
+    """
+    if db is None:
+        return
+    try:
+        for collection_name, indexes in INDEXES.items():
+            for keys in indexes:
+                await db[collection_name].create_index(keys)
+    except PyMongoError as e:
+        logger.warning("Could not create indexes, continuing without them: %s", e)
+
+@lru_cache(maxsize=None)
+def _adapter(model_cls: type) -> TypeAdapter:
+    """One cached TypeAdapter per model class, so serializers are built only once"""
+    return TypeAdapter(model_cls)
+
+def warm_serializers(model_classes):
+    """Build the cached TypeAdapter for each model now, so the first insert doesn't pay for it"""
+    for model_cls in model_classes:
+        _adapter(model_cls)
+
+def _to_document(data: Union[BaseModel, dict]) -> dict:
+    """Convert a Pydantic model or dict into a fresh dict ready for insertion"""
+    if isinstance(data, BaseModel):
+        # None fields are left out: Mongo treats a missing field like null in queries,
+        # and smaller documents are cheaper to encode and store
+        return _adapter(type(data)).dump_python(data, mode="python", exclude_none=True)
+    return data.copy()
+
 # Helper functions for common database operations
-def create_document(collection_name: str, data: Union[BaseModel, dict]):
+async def create_document(collection_name: str, data: Union[BaseModel, dict]):
     """Insert a single document with timestamp"""
     if db is None:
         raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
 
-    # Convert Pydantic model to dict if needed
-    if isinstance(data, BaseModel):
-        data_dict = data.model_dump()
-    else:
-        data_dict = data.copy()
-
-    data_dict['created_at'] = datetime.now(timezone.utc)
-    data_dict['updated_at'] = datetime.now(timezone.utc)
+    data_dict = _to_document(data)
+    now = datetime.now(timezone.utc)
+    data_dict['created_at'] = now
+    data_dict['updated_at'] = now
 
-    result = db[collection_name].insert_one(data_dict)
+    result = await db[collection_name].insert_one(data_dict)
     return str(result.inserted_id)
 
-def get_documents(collection_name: str, filter_dict: dict = None, limit: int = None):
-    """Get documents from collection"""
+class BulkInsertError(Exception):
+    """Raised when only part of a bulk insert was written.
+
+    inserted_ids holds the ids of the documents that were stored; errors holds
+    {"index", "message"} for each item that failed, indexed into the input list.
+    """
+
+    def __init__(self, inserted_ids: List[str], errors: List[dict]):
+        super().__init__(f"{len(errors)} of {len(inserted_ids) + len(errors)} documents failed to insert")
+        self.inserted_ids = inserted_ids
+        self.errors = errors
+
+async def bulk_create_documents(collection_name: str, items: List[Union[BaseModel, dict]]):
+    """Insert many documents in one round-trip, sharing a single timestamp.
+
+    The insert is unordered, so one failing document doesn't stop the rest; if any
+    fail, BulkInsertError reports which ones were written and which were not.
+    """
+    if db is None:
+        raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
+    if not items:
+        return []
+
+    now = datetime.now(timezone.utc)
+    docs = []
+    for data in items:
+        data_dict = _to_document(data)
+        data_dict['created_at'] = now
+        data_dict['updated_at'] = now
+        docs.append(data_dict)
+
+    try:
+        result = await db[collection_name].insert_many(docs, ordered=False)
+    except BulkWriteError as e:
+        # insert_many assigns _id to every doc up front, so the written ids are
+        # those of the docs that don't appear in writeErrors
+        errors = [{"index": err["index"], "message": err.get("errmsg", "")} for err in e.details.get("writeErrors", [])]
+        failed = {err["index"] for err in errors}
+        inserted_ids = [str(doc["_id"]) for i, doc in enumerate(docs) if i not in failed]
+        raise BulkInsertError(inserted_ids, errors) from e
+    return [str(_id) for _id in result.inserted_ids]
+
+async def get_document(collection_name: str, document_id: str):
+    """Get a single document by its id, or None if the id is invalid or not found"""
+    if db is None:
+        raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
+    if not ObjectId.is_valid(document_id):
+        return None
+    return await db[collection_name].find_one({"_id": ObjectId(document_id)})
+
+async def get_documents(collection_name: str, filter_dict: dict = None, limit: int = None, projection: dict = None,
+                        after_id: ObjectId = None):
+    """Get documents from collection, optionally returning only the projected fields.
+
+    With a limit, documents come back in _id order; pass the last _id seen as
+    after_id to fetch the next page (cursor paging, no skip scans).
+    """
     if db is None:
         raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
     
-    cursor = db[collection_name].find(filter_dict or {})
+    filter_dict = dict(filter_dict or {})
+    if after_id is not None:
+        filter_dict["_id"] = {"$gt": after_id}
+
+    cursor = db[collection_name].find(filter_dict, projection)
     if limit:
-        cursor = cursor.limit(limit)
+        # batch_size=limit fetches the whole page in one reply instead of a
+        # 101-document first batch followed by getMore round trips
+        cursor = cursor.sort("_id", 1).limit(limit).batch_size(limit)
     
-    return list(cursor)
+    return await cursor.to_list(length=limit)
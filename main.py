@@ -1,18 +1,80 @@
+import asyncio
 import os
+import time
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from decimal import Decimal
+from typing import List, NamedTuple, Optional, Literal, Dict, Any, Tuple
 
-from fastapi import FastAPI, HTTPException
+import orjson
+from bson import Decimal128, ObjectId
+from fastapi import Body, Depends, FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from pydantic import BaseModel
 
-from database import db, create_document, get_documents
+from cache import ResponseCacheMiddleware, invalidate
+from database import (
+    db, create_document, bulk_create_documents, get_document, get_documents,
+    ensure_indexes, warm_serializers, BulkInsertError
+)
 from schemas import (
     User, Course, Lesson, Assignment, Quiz, Enrollment, Submission,
-    QuizAttempt, Subscription, Activity, SCHEMAS
+    QuizAttempt, Subscription, Activity, COLLECTION_FIELDS, COLLECTION_MODELS,
+    schemas_json_bytes, schema_json_bytes, schema_summary_json_bytes
 )
 
-app = FastAPI(title="EduSaaS API", version="1.0.0")
+
+def _orjson_default(obj: Any) -> Any:
+    """Fallback for types orjson can't serialize natively.
+
+    Exact type checks come first, ordered by frequency: every Mongo document
+    carries an ObjectId, decimals are rare.
+    """
+    t = type(obj)
+    if t is ObjectId:
+        return str(obj)
+    if t is Decimal128:
+        return float(obj.to_decimal())
+    if t is Decimal:
+        return float(obj)
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    raise TypeError(f"Type is not JSON serializable: {t.__name__}")
+
+
+_ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+class MongoJSONResponse(ORJSONResponse):
+    """ORJSONResponse that also handles ObjectId, decimals and naive (UTC) datetimes from Mongo."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_orjson_default, option=_ORJSON_OPTIONS)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warm_serializers(COLLECTION_MODELS.values())
+    # Build indexes in the background: with Mongo down, server selection can block
+    # for 30s and startup must not wait on (or fail with) the database
+    index_task = asyncio.create_task(ensure_indexes())
+    yield
+    index_task.cancel()
+
+
+app = FastAPI(
+    title="EduSaaS API",
+    version="1.0.0",
+    default_response_class=MongoJSONResponse,
+    lifespan=lifespan,
+)
+
+# Middleware runs outside-in as GZip -> CORS -> cache (last added is outermost).
+# The cache sits innermost so HIT/STALE responses still get CORS headers, and
+# cached bodies are stored uncompressed and compressed per Accept-Encoding.
+app.add_middleware(ResponseCacheMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -22,16 +84,53 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
+@app.exception_handler(BulkInsertError)
+async def bulk_insert_error_handler(request: Request, exc: BulkInsertError):
+    # 207: some items were stored; report their ids alongside the failures
+    return MongoJSONResponse({"ids": exc.inserted_ids, "errors": exc.errors}, status_code=207)
+
 @app.get("/")
-def read_root():
+async def read_root():
     return {"message": "EduSaaS backend running"}
 
 @app.get("/schema")
-def get_schema():
-    return {"collections": SCHEMAS}
+async def get_schema():
+    return Response(content=schemas_json_bytes(), media_type="application/json")
+
+@app.get("/schema/summary")
+async def get_schema_summary():
+    return Response(content=schema_summary_json_bytes(), media_type="application/json")
+
+@app.get("/schema/{name}")
+async def get_collection_schema(name: str):
+    if name not in COLLECTION_MODELS:
+        raise HTTPException(status_code=404, detail=f"Unknown collection: {name}")
+    return Response(content=schema_json_bytes(name), media_type="application/json")
+
+# Health probes hit /test often and list_collection_names is an admin round-trip,
+# so its result is reused for this many seconds
+COLLECTIONS_TTL = 30.0
+_collections_cache: Dict[str, Any] = {"names": None, "fetched_at": 0.0}
+
+async def cached_collection_names() -> Tuple[List[str], bool]:
+    """Return (collection names, stale). On a DB error the last good list is returned
+    as stale so probes don't fail during brief blips; with no prior list it re-raises."""
+    now = time.monotonic()
+    if _collections_cache["names"] is not None and now - _collections_cache["fetched_at"] < COLLECTIONS_TTL:
+        return _collections_cache["names"], False
+    try:
+        names = await db.list_collection_names()
+    except Exception:
+        if _collections_cache["names"] is None:
+            raise
+        return _collections_cache["names"], True
+    _collections_cache.update(names=names, fetched_at=now)
+    return names, False
 
 @app.get("/test")
-def test_database():
+async def test_database():
     response = {
         "backend": "✅ Running",
         "database": "❌ Not Available",
@@ -47,9 +146,9 @@ def test_database():
             response["database_name"] = getattr(db, "name", None) or "✅ Connected"
             response["connection_status"] = "Connected"
             try:
-                collections = db.list_collection_names()
+                collections, stale = await cached_collection_names()
                 response["collections"] = collections[:10]
-                response["database"] = "✅ Connected & Working"
+                response["database"] = "✅ Connected & Working" + (" (cached)" if stale else "")
             except Exception as e:
                 response["database"] = f"⚠️  Connected but Error: {str(e)[:80]}"
         else:
@@ -58,7 +157,98 @@ def test_database():
         response["database"] = f"❌ Error: {str(e)[:80]}"
     return response
 
+# Upper bound on items per bulk request, so one body can't build an unbounded insert
+BULK_MAX_ITEMS = 1000
+
+# Fields every stored document has besides its model fields
+DOCUMENT_FIELDS = ("_id", "created_at", "updated_at")
+
+def parse_fields(collection_name: str, fields: Optional[str]) -> Optional[Dict[str, int]]:
+    """Turn a `?fields=title,course_id` query param into a Mongo projection.
+
+    Only the collection's own field names are accepted, so client input can never
+    form an invalid projection (`$`-prefixed names, colliding paths).
+    """
+    if not fields:
+        return None
+    names = [f for f in (part.strip() for part in fields.split(",")) if f]
+    allowed = COLLECTION_FIELDS[collection_name]
+    unknown = [f for f in names if f not in allowed and f not in DOCUMENT_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return {f: 1 for f in names}
+
+class PageParams(NamedTuple):
+    fields: Optional[str]
+    limit: int
+    cursor: Optional[str]
+
+def page_params(
+    fields: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+) -> PageParams:
+    """Query params shared by every list route: projection, page size and cursor"""
+    return PageParams(fields, limit, cursor)
+
+async def list_page(collection_name: str, filter_q: Dict[str, Any], page: PageParams) -> MongoJSONResponse:
+    """Fetch one page of a collection; next_cursor is the _id to resume after, or None"""
+    after_id = None
+    if page.cursor:
+        if not ObjectId.is_valid(page.cursor):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        after_id = ObjectId(page.cursor)
+    items = await get_documents(collection_name, filter_q, limit=page.limit,
+                                projection=parse_fields(collection_name, page.fields), after_id=after_id)
+    next_cursor = str(items[-1]["_id"]) if len(items) == page.limit else None
+    return MongoJSONResponse({"items": items, "next_cursor": next_cursor})
+
 # Basic endpoints for key flows (create + list)
+# Bulk endpoints accept at most this many items per request; on partial failure
+# they answer 207 with the ids that were written and the per-item errors.
+# Create endpoints answer 201 with just the new id; activity tracking is
+# fire-and-forget and answers 202 with an empty body.
+# Request models are validated by FastAPI, so collection models are built with
+# model_construct to skip a second validation pass. Request fields must therefore
+# be at least as strict as the collection model fields they feed.
+
+def no_filter() -> Dict[str, Any]:
+    return {}
+
+def by_course(course_id: Optional[str] = None) -> Dict[str, Any]:
+    return {"course_id": course_id} if course_id else {}
+
+def by_user(user_id: Optional[str] = None) -> Dict[str, Any]:
+    return {"user_id": user_id} if user_id else {}
+
+def register_crud(path: str, collection_name: str, model_cls: type, request_cls: type,
+                  filter_dep=no_filter, **fixed: Any):
+    """Register create, list and get-by-id routes for a collection whose create
+    payload maps field-for-field onto its model. `fixed` values are set on every
+    created document; `filter_dep` turns list query params into a Mongo filter."""
+    construct = model_cls.model_construct
+
+    async def create_item(payload: request_cls):
+        item = construct(**payload.__dict__, **fixed)
+        item_id = await create_document(collection_name, item)
+        await invalidate(path)
+        return {"id": item_id}
+
+    async def list_items(
+        filter_q: Dict[str, Any] = Depends(filter_dep),
+        page: PageParams = Depends(page_params),
+    ):
+        return await list_page(collection_name, filter_q, page)
+
+    async def get_item(item_id: str):
+        doc = await get_document(collection_name, item_id)
+        if doc is None:
+            raise HTTPException(status_code=404, detail=f"{model_cls.__name__} not found")
+        return MongoJSONResponse(doc)
+
+    app.add_api_route(path, create_item, methods=["POST"], status_code=201, name=f"create_{collection_name}")
+    app.add_api_route(path, list_items, methods=["GET"], name=f"list_{path.strip('/')}")
+    app.add_api_route(f"{path}/{{item_id}}", get_item, methods=["GET"], name=f"get_{collection_name}")
 
 class CreateCourseRequest(BaseModel):
     title: str
@@ -67,27 +257,7 @@ class CreateCourseRequest(BaseModel):
     category: Optional[str] = None
     tags: List[str] = []
     thumbnail_url: Optional[str] = None
-    level: str = "beginner"
-
-@app.post("/courses")
-def create_course(payload: CreateCourseRequest):
-    course = Course(
-        title=payload.title,
-        description=payload.description,
-        teacher_id=payload.teacher_id,
-        category=payload.category,
-        tags=payload.tags,
-        thumbnail_url=payload.thumbnail_url,
-        level=payload.level,
-        is_published=False,
-    )
-    course_id = create_document("course", course)
-    return {"id": course_id, "message": "Course created"}
-
-@app.get("/courses")
-def list_courses():
-    items = get_documents("course")
-    return {"items": items}
+    level: Literal["beginner", "intermediate", "advanced"] = "beginner"
 
 class CreateLessonRequest(BaseModel):
     course_id: str
@@ -96,78 +266,64 @@ class CreateLessonRequest(BaseModel):
     content: Optional[str] = None
     order: int = 0
 
-@app.post("/lessons")
-def create_lesson(payload: CreateLessonRequest):
-    lesson = Lesson(**payload.model_dump())
-    lesson_id = create_document("lesson", lesson)
-    return {"id": lesson_id, "message": "Lesson created"}
-
-@app.get("/lessons")
-def list_lessons(course_id: Optional[str] = None):
-    filter_q = {"course_id": course_id} if course_id else {}
-    items = get_documents("lesson", filter_q)
-    return {"items": items}
-
 class CreateAssignmentRequest(BaseModel):
     course_id: str
     title: str
     instructions: str
 
-@app.post("/assignments")
-def create_assignment(payload: CreateAssignmentRequest):
-    assignment = Assignment(
-        course_id=payload.course_id,
-        title=payload.title,
-        instructions=payload.instructions,
-    )
-    assignment_id = create_document("assignment", assignment)
-    return {"id": assignment_id, "message": "Assignment created"}
-
-@app.get("/assignments")
-def list_assignments(course_id: Optional[str] = None):
-    filter_q = {"course_id": course_id} if course_id else {}
-    items = get_documents("assignment", filter_q)
-    return {"items": items}
-
 class CreateQuizRequest(BaseModel):
     course_id: str
     title: str
 
-@app.post("/quizzes")
-def create_quiz(payload: CreateQuizRequest):
-    quiz = Quiz(course_id=payload.course_id, title=payload.title, questions=[])
-    quiz_id = create_document("quiz", quiz)
-    return {"id": quiz_id, "message": "Quiz created"}
-
-@app.get("/quizzes")
-def list_quizzes(course_id: Optional[str] = None):
-    filter_q = {"course_id": course_id} if course_id else {}
-    items = get_documents("quiz", filter_q)
-    return {"items": items}
+register_crud("/courses", "course", Course, CreateCourseRequest, is_published=False)
+register_crud("/lessons", "lesson", Lesson, CreateLessonRequest, by_course)
+register_crud("/assignments", "assignment", Assignment, CreateAssignmentRequest, by_course)
+register_crud("/quizzes", "quiz", Quiz, CreateQuizRequest, by_course)
 
 class EnrollRequest(BaseModel):
     course_id: str
     student_id: str
 
-@app.post("/enroll")
-def enroll_student(payload: EnrollRequest):
-    enr = create_document("enrollment", {
+@app.post("/enroll", status_code=201)
+async def enroll_student(payload: EnrollRequest):
+    enr = await create_document("enrollment", {
         "course_id": payload.course_id,
         "student_id": payload.student_id,
         "status": "active",
         "progress_percent": 0.0,
     })
-    return {"id": enr, "message": "Enrollment created"}
+    await invalidate("/enrollments")
+    return {"id": enr}
+
+@app.post("/enrollments/bulk", status_code=201)
+async def enroll_students_bulk(payload: List[EnrollRequest] = Body(..., max_length=BULK_MAX_ITEMS)):
+    try:
+        ids = await bulk_create_documents("enrollment", [
+            {
+                "course_id": p.course_id,
+                "student_id": p.student_id,
+                "status": "active",
+                "progress_percent": 0.0,
+            }
+            for p in payload
+        ])
+    finally:
+        # Partial inserts still changed the list
+        await invalidate("/enrollments")
+    return {"ids": ids}
 
 @app.get("/enrollments")
-def list_enrollments(course_id: Optional[str] = None, student_id: Optional[str] = None):
+async def list_enrollments(
+    course_id: Optional[str] = None,
+    student_id: Optional[str] = None,
+    page: PageParams = Depends(page_params),
+):
     q: Dict[str, Any] = {}
     if course_id:
         q["course_id"] = course_id
     if student_id:
         q["student_id"] = student_id
-    items = get_documents("enrollment", q)
-    return {"items": items}
+    return await list_page("enrollment", q, page)
 
 class SubmitAssignmentRequest(BaseModel):
     assignment_id: str
@@ -175,21 +331,33 @@ class SubmitAssignmentRequest(BaseModel):
     content_url: Optional[str] = None
     content_text: Optional[str] = None
 
-@app.post("/submit")
-def submit_assignment(payload: SubmitAssignmentRequest):
-    sub = Submission(**payload.model_dump())
-    sub_id = create_document("submission", sub)
-    return {"id": sub_id, "message": "Submission received"}
+@app.post("/submit", status_code=201)
+async def submit_assignment(payload: SubmitAssignmentRequest):
+    sub = Submission.model_construct(**payload.__dict__)
+    sub_id = await create_document("submission", sub)
+    await invalidate("/submissions")
+    return {"id": sub_id}
+
+@app.post("/submissions/bulk", status_code=201)
+async def submit_assignments_bulk(payload: List[SubmitAssignmentRequest] = Body(..., max_length=BULK_MAX_ITEMS)):
+    try:
+        ids = await bulk_create_documents("submission", [Submission.model_construct(**p.__dict__) for p in payload])
+    finally:
+        await invalidate("/submissions")
+    return {"ids": ids}
 
 @app.get("/submissions")
-def list_submissions(assignment_id: Optional[str] = None, student_id: Optional[str] = None):
+async def list_submissions(
+    assignment_id: Optional[str] = None,
+    student_id: Optional[str] = None,
+    page: PageParams = Depends(page_params),
+):
     q: Dict[str, Any] = {}
     if assignment_id:
         q["assignment_id"] = assignment_id
     if student_id:
         q["student_id"] = student_id
-    items = get_documents("submission", q)
-    return {"items": items}
+    return await list_page("submission", q, page)
 
 class TrackActivityRequest(BaseModel):
     user_id: str
@@ -197,37 +365,43 @@ class TrackActivityRequest(BaseModel):
     resource_type: str
     resource_id: str
 
-@app.post("/activity")
-def track_activity(payload: TrackActivityRequest):
-    act = Activity(
+@app.post("/activity", status_code=202, response_class=Response)
+async def track_activity(payload: TrackActivityRequest):
+    act = Activity.model_construct(
         user_id=payload.user_id,
         action=payload.action,
         resource_type=payload.resource_type,
         resource_id=payload.resource_id,
         metadata={}
     )
-    act_id = create_document("activity", act)
-    return {"id": act_id, "message": "Activity tracked"}
+    await create_document("activity", act)
+    return Response(status_code=202)
+
+@app.post("/activities/bulk", status_code=202, response_class=Response)
+async def track_activities_bulk(payload: List[TrackActivityRequest] = Body(..., max_length=BULK_MAX_ITEMS)):
+    await bulk_create_documents("activity", [Activity.model_construct(**p.__dict__, metadata={}) for p in payload])
+    return Response(status_code=202)
 
 # Subscription mock endpoints (no payment provider integration here)
 class CreateSubscriptionRequest(BaseModel):
     user_id: str
-    plan: str = "free"
+    plan: Literal["free", "pro", "team", "enterprise"] = "free"
 
-@app.post("/subscriptions")
-def create_subscription(payload: CreateSubscriptionRequest):
-    sub = Subscription(user_id=payload.user_id, plan=payload.plan)
-    sub_id = create_document("subscription", sub)
-    return {"id": sub_id, "message": "Subscription created"}
-
-@app.get("/subscriptions")
-def list_subscriptions(user_id: Optional[str] = None):
-    q = {"user_id": user_id} if user_id else {}
-    items = get_documents("subscription", q)
-    return {"items": items}
+register_crud("/subscriptions", "subscription", Subscription, CreateSubscriptionRequest, by_user)
 
 
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    # 2n+1 worker processes spread CPU-bound work past the GIL; uvloop and
+    # httptools (from uvicorn[standard]) replace the pure-Python loop and parser
+    workers = int(os.getenv("WEB_CONCURRENCY", 2 * (os.cpu_count() or 1) + 1))
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=port,
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
+        log_level="warning",
+    )
@@ -9,18 +9,38 @@ Examples:
 These models are also returned via GET /schema for tooling and validation.
 """
 from typing import List, Optional, Literal, Dict, Any
-from pydantic import BaseModel, Field
+import orjson
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
+from functools import cache
+
+# Shared base so serialization tuning for every collection lives in one place
+class ORJSONBaseModel(BaseModel):
+    model_config = ConfigDict(
+        ser_json_bytes="base64",
+        ser_json_timedelta="iso8601",
+        populate_by_name=True,
+        # Build validators/serializers when the class is defined, not on first use
+        defer_build=False,
+    )
+
+    def model_dump(self, *, exclude_none: bool = True, **kwargs) -> Dict[str, Any]:
+        """Like BaseModel.model_dump, but leaves out None fields by default"""
+        return super().model_dump(exclude_none=exclude_none, **kwargs)
+
+    def model_dump_json(self, *, exclude_none: bool = True, **kwargs) -> str:
+        """Like BaseModel.model_dump_json, but leaves out None fields by default"""
+        return super().model_dump_json(exclude_none=exclude_none, **kwargs)
 
 # Core identities
-class User(BaseModel):
+class User(ORJSONBaseModel):
     name: str = Field(..., description="Full name")
     email: str = Field(..., description="Email address")
     role: Literal["teacher", "student", "admin"] = Field("student", description="Role in the platform")
     avatar_url: Optional[str] = Field(None, description="Profile image URL")
     is_active: bool = Field(True, description="Whether user is active")
 
-class Course(BaseModel):
+class Course(ORJSONBaseModel):
     title: str = Field(..., description="Course title")
     description: Optional[str] = Field("", description="Short description")
     teacher_id: str = Field(..., description="Owner teacher user id")
@@ -30,7 +50,7 @@ class Course(BaseModel):
     level: Literal["beginner", "intermediate", "advanced"] = Field("beginner")
     is_published: bool = Field(False)
 
-class Lesson(BaseModel):
+class Lesson(ORJSONBaseModel):
     course_id: str
     title: str
     video_url: Optional[str] = None
@@ -38,31 +58,31 @@ class Lesson(BaseModel):
     order: int = 0
     duration_minutes: Optional[int] = None
 
-class Assignment(BaseModel):
+class Assignment(ORJSONBaseModel):
     course_id: str
     title: str
     instructions: str
     due_date: Optional[datetime] = None
     max_points: int = 100
 
-class QuizQuestion(BaseModel):
+class QuizQuestion(ORJSONBaseModel):
     question: str
     options: List[str]
     correct_index: int
 
-class Quiz(BaseModel):
+class Quiz(ORJSONBaseModel):
     course_id: str
     title: str
     questions: List[QuizQuestion] = Field(default_factory=list)
     time_limit_minutes: Optional[int] = None
 
-class Enrollment(BaseModel):
+class Enrollment(ORJSONBaseModel):
     course_id: str
     student_id: str
     status: Literal["active", "completed", "dropped"] = "active"
     progress_percent: float = 0.0
 
-class Submission(BaseModel):
+class Submission(ORJSONBaseModel):
     assignment_id: str
     student_id: str
     content_url: Optional[str] = None
@@ -70,19 +90,19 @@ class Submission(BaseModel):
     grade: Optional[float] = None
     feedback: Optional[str] = None
 
-class QuizAttempt(BaseModel):
+class QuizAttempt(ORJSONBaseModel):
     quiz_id: str
     student_id: str
     answers: List[int]
     score: Optional[float] = None
 
-class Subscription(BaseModel):
+class Subscription(ORJSONBaseModel):
     user_id: str
     plan: Literal["free", "pro", "team", "enterprise"] = "free"
     status: Literal["active", "past_due", "canceled"] = "active"
     renews_at: Optional[datetime] = None
 
-class Activity(BaseModel):
+class Activity(ORJSONBaseModel):
     user_id: str
     action: str
     resource_type: str
@@ -90,18 +110,79 @@ class Activity(BaseModel):
     metadata: Dict[str, Any] = Field(default_factory=dict)
 
 # Helper to expose schema metadata for tooling
-class SchemaInfo(BaseModel):
+class SchemaInfo(ORJSONBaseModel):
     collections: Dict[str, Dict[str, Any]]
 
-SCHEMAS: Dict[str, Any] = {
-    "user": User.model_json_schema(),
-    "course": Course.model_json_schema(),
-    "lesson": Lesson.model_json_schema(),
-    "assignment": Assignment.model_json_schema(),
-    "quiz": Quiz.model_json_schema(),
-    "enrollment": Enrollment.model_json_schema(),
-    "submission": Submission.model_json_schema(),
-    "quizattempt": QuizAttempt.model_json_schema(),
-    "subscription": Subscription.model_json_schema(),
-    "activity": Activity.model_json_schema(),
+# Collection name -> model. JSON schemas are generated on first use rather than at
+# import, keeping cold starts cheap.
+COLLECTION_MODELS: Dict[str, type] = {
+    "user": User,
+    "course": Course,
+    "lesson": Lesson,
+    "assignment": Assignment,
+    "quiz": Quiz,
+    "enrollment": Enrollment,
+    "submission": Submission,
+    "quizattempt": QuizAttempt,
+    "subscription": Subscription,
+    "activity": Activity,
+}
+
+@cache
+def schemas() -> Dict[str, Any]:
+    """JSON schema of every collection, built once on first call"""
+    return {name: model.model_json_schema() for name, model in COLLECTION_MODELS.items()}
+
+@cache
+def schemas_json_bytes() -> bytes:
+    """GET /schema payload, serialized once since it is fully static"""
+    return orjson.dumps({"collections": schemas()})
+
+# Compact views for clients that only need names and fields, not full JSON schemas
+COLLECTION_NAMES: List[str] = list(COLLECTION_MODELS)
+COLLECTION_FIELDS: Dict[str, List[str]] = {
+    name: list(model.model_fields) for name, model in COLLECTION_MODELS.items()
 }
+
+def _field_type(prop: Dict[str, Any]) -> str:
+    """Short type label for a JSON schema property, e.g. "string|null" or "array<QuizQuestion>" """
+    if "$ref" in prop:
+        return prop["$ref"].rsplit("/", 1)[-1]
+    if "anyOf" in prop:
+        return "|".join(_field_type(p) for p in prop["anyOf"])
+    if prop.get("type") == "array" and "items" in prop:
+        return f"array<{_field_type(prop['items'])}>"
+    return prop.get("type", "any")
+
+@cache
+def schema_summary() -> Dict[str, Any]:
+    """Collections as parallel arrays: names, field counts, field names and field types"""
+    full = schemas()
+    field_types = [
+        [_field_type(full[name]["properties"][field]) for field in COLLECTION_FIELDS[name]]
+        for name in COLLECTION_NAMES
+    ]
+    return {
+        "collections": COLLECTION_NAMES,
+        "field_counts": [len(COLLECTION_FIELDS[name]) for name in COLLECTION_NAMES],
+        "field_names": [COLLECTION_FIELDS[name] for name in COLLECTION_NAMES],
+        "field_types": field_types,
+    }
+
+@cache
+def schema_summary_json_bytes() -> bytes:
+    """GET /schema/summary payload, serialized once"""
+    return orjson.dumps(schema_summary())
+
+@cache
+def schema_json_bytes(name: str) -> bytes:
+    """GET /schema/{name} payload, serialized once per collection; KeyError if unknown"""
+    return orjson.dumps(schemas()[name])
+
+def __getattr__(name: str) -> Any:
+    # Keep `from schemas import SCHEMAS` working without building schemas at import
+    if name == "SCHEMAS":
+        return schemas()
+    if name == "SCHEMAS_JSON_BYTES":
+        return schemas_json_bytes()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")